@@ -0,0 +1,212 @@
+import math
+
+import numpy as np
+
+from multiprocessing import cpu_count
+from pymoo.algorithms.moo.rnsga3 import RNSGA3
+from pymoo.algorithms.moo.nsga2 import NSGA2, PM, SBX
+from pymoo.algorithms.moo.nsga3 import NSGA3
+from pymoo.operators.sampling.lhs import LHS
+from pymoo.termination import get_termination
+from pymoo.util.ref_dirs import get_reference_directions
+
+from .optimiser import ShetranProblem
+
+DEFAULT_ALGORITHM_SETTINGS = {
+    "Name": "RNSGA3",
+    "PopSize": 120,
+    "Offspring": None,
+    "Workers": None,
+    "Termination": {"Type": "n_eval", "Value": 12000},
+    "InitialSolutions": [],
+    "Options": {},
+}
+
+
+def round_to_workers(n: int, n_workers: int) -> int:
+    """
+    Round a number of evaluations up to the next multiple of the number of workers.
+
+    :param n: Number of evaluations.
+    :type n: int
+    :param n_workers: Number of worker slots.
+    :type n_workers: int
+    :return: Number of evaluations that fills every worker slot.
+    :rtype: int
+    """
+    return max(1, math.ceil(n / n_workers)) * n_workers
+
+
+def get_algorithm_settings(config: dict, name: str | None = None) -> dict:
+    """
+    Read the algorithm settings from a project config, filling in any missing values.
+
+    Only the offspring count is rounded to the number of workers, as it is the
+    number of evaluations per generation. The population size is passed to the
+    algorithm unchanged, since reference direction based algorithms only accept
+    certain sizes.
+
+    :param config: Configuration dictionary loaded from the project config json.
+    :type config: dict
+    :param name: Algorithm name to use instead of the one in the config.
+    :type name: str | None
+    """
+    settings = {**DEFAULT_ALGORITHM_SETTINGS, **config.get("AlgorithmDetails", {})}
+
+    if name:
+        settings["Name"] = name
+
+    if not settings["Workers"]:
+        settings["Workers"] = cpu_count()
+
+    if not settings["Offspring"]:
+        settings["Offspring"] = settings["PopSize"]
+
+    settings["Offspring"] = round_to_workers(settings["Offspring"], settings["Workers"])
+
+    return settings
+
+
+def create_initial_population(settings: dict, problem: ShetranProblem) -> np.ndarray:
+    """
+    Sample an initial population, seeded with any initial solutions from the config.
+    """
+    solutions = settings["InitialSolutions"]
+
+    if len(solutions) > settings["PopSize"]:
+        raise Exception(
+            f"{len(solutions)} initial solutions given but the population size is {settings['PopSize']}!"
+        )
+
+    for i, solution in enumerate(solutions):
+        if len(solution) != problem.n_var:
+            raise Exception(
+                f"Initial solution {i} has {len(solution)} values but there are {problem.n_var} parameters to optimise!"
+            )
+
+    initial_pop_X = LHS().do(problem, settings["PopSize"]).get("X")
+
+    for i, solution in enumerate(solutions):
+        initial_pop_X[i, :] = np.array(solution, dtype=float)
+
+    return initial_pop_X
+
+
+def setup_rnsga3(settings: dict, sampling: np.ndarray, problem: ShetranProblem):
+    options = settings["Options"]
+    ref_points = np.array(options.get("RefPoints", [[0.08, 0.08, 0.15]]))
+
+    return RNSGA3(
+        ref_points=ref_points,
+        pop_per_ref_point=settings["PopSize"] // len(ref_points),
+        mu=options.get("Mu", 0.05),
+        sampling=sampling,
+        n_offsprings=settings["Offspring"],
+        eliminate_duplicates=True,
+    )
+
+
+def setup_nsga2(settings: dict, sampling: np.ndarray, problem: ShetranProblem):
+    options = settings["Options"]
+
+    return NSGA2(
+        pop_size=settings["PopSize"],
+        n_offsprings=settings["Offspring"],
+        sampling=sampling,
+        eliminate_duplicates=True,
+        crossover=SBX(eta=options.get("CrossoverEta", 15)),
+        mutation=PM(eta=options.get("MutationEta", 5)),
+    )
+
+
+def setup_nsga3(settings: dict, sampling: np.ndarray, problem: ShetranProblem):
+    ref_dirs = get_reference_directions(
+        "energy", problem.n_obj, settings["PopSize"], seed=1
+    )
+
+    return NSGA3(
+        ref_dirs=ref_dirs,
+        pop_size=settings["PopSize"],
+        n_offsprings=settings["Offspring"],
+        sampling=sampling,
+        eliminate_duplicates=True,
+    )
+
+
+ALGORITHMS = {
+    "RNSGA3": setup_rnsga3,
+    "NSGA2": setup_nsga2,
+    "NSGA3": setup_nsga3,
+}
+
+
+def setup_algorithm(settings: dict, problem: ShetranProblem):
+    """
+    Create the optimisation algorithm named in the algorithm settings.
+
+    :param settings: Algorithm settings from get_algorithm_settings.
+    :type settings: dict
+    :param problem: Problem to be optimised.
+    :type problem: ShetranProblem
+    """
+    key = settings["Name"].upper().replace("/", "").replace("-", "")
+
+    if key not in ALGORITHMS:
+        raise Exception(
+            f"Unknown algorithm {settings['Name']}! Choose from: {', '.join(ALGORITHMS)}"
+        )
+
+    sampling = create_initial_population(settings, problem)
+
+    return ALGORITHMS[key](settings, sampling, problem)
+
+
+def apply_resume_settings(algorithm, settings: dict):
+    """
+    Apply the termination and offspring count from the config to an algorithm loaded from a checkpoint.
+
+    The algorithm type and population size cannot change mid-run, so a warning
+    is printed if they differ from the config.
+
+    :param algorithm: Algorithm loaded from a checkpoint.
+    :param settings: Algorithm settings from get_algorithm_settings.
+    :type settings: dict
+    """
+    key = settings["Name"].upper().replace("/", "").replace("-", "")
+    checkpoint_key = type(algorithm).__name__.upper()
+
+    if key != checkpoint_key:
+        print(
+            f"Warning: checkpoint uses {type(algorithm).__name__} but {settings['Name']} was requested. "
+            f"Continuing with {type(algorithm).__name__}."
+        )
+
+    if checkpoint_key != "RNSGA3" and algorithm.pop_size != settings["PopSize"]:
+        print(
+            f"Warning: checkpoint population size is {algorithm.pop_size} but the config sets "
+            f"{settings['PopSize']}. Continuing with {algorithm.pop_size}."
+        )
+
+    if algorithm.n_offsprings != settings["Offspring"]:
+        print(
+            f"Offspring count changed from {algorithm.n_offsprings} to {settings['Offspring']} "
+            f"for {settings['Workers']} workers."
+        )
+        algorithm.n_offsprings = settings["Offspring"]
+
+    algorithm.termination = setup_termination(settings)
+
+
+def setup_termination(settings: dict):
+    """
+    Create the termination criterion from the algorithm settings.
+
+    Supports any pymoo termination type, e.g. an evaluation budget ("n_eval")
+    or a wall-clock budget ("time", given as "HH:MM:SS").
+
+    :param settings: Algorithm settings from get_algorithm_settings.
+    :type settings: dict
+    """
+    termination = settings["Termination"]
+
+    return get_termination(termination["Type"], termination["Value"])
@@ -2,17 +2,12 @@ import sys
 import os
 import dill
 
-import numpy as np
-
 from argparse import ArgumentParser, Namespace
 from pathlib import Path
+from datetime import date
 from pymoo.optimize import minimize
-from pymoo.algorithms.moo.rnsga3 import RNSGA3
-from pymoo.operators.sampling.lhs import LHS
-from pymoo.algorithms.moo.nsga2 import NSGA2, PM, SBX
-from pymoo.termination import get_termination
 from pymoo.parallelization.starmap import StarmapParallelization
-from multiprocessing import cpu_count, Manager
+from multiprocessing import Manager
 from multiprocessing.pool import ThreadPool
 from dotenv import set_key
 
@@ -20,6 +15,18 @@ from dotenv import set_key
 from .settings import Settings, create_settings
 from .shetran_interaction import load_shetran_params
 from .optimiser import ShetranProblem, Checkpoint
+from .algorithms import (
+    get_algorithm_settings,
+    setup_algorithm,
+    setup_termination,
+    apply_resume_settings,
+)
+from .validation import ShetranValidator
+from .results_analysis import (
+    VALIDATION_PERIOD_FIELDS,
+    select_candidates,
+    write_validation_comparison,
+)
 
 def update_config(args: Namespace):
     if not os.path.exists(".env"):
@@ -31,46 +38,29 @@ def update_config(args: Namespace):
     if args.prepare_executable:
         set_key(".env", "SHETRAN_PREPARE_EXECUTABLE", str(args.prepare_executable))
 
-def setup_algorithm(args: Namespace, n_threads: int, problem: ShetranProblem):
-    pop = 120
-    print(pop)
+    if args.scratch_directory:
+        set_key(".env", "SCRATCH_DIRECTORY", str(args.scratch_directory))
 
-    sampling = LHS()
-    
-    initial_pop_X = sampling.do(problem, pop).get("X") 
-
-    best_solution = np.array([
-        1.2380, 4.6126, 0.6087, 0.6724, 1.0643,
-        0.3332, 4.0000, 0.0315, 0.4743, 3.8256,
-        0.1124, 3.4263, 0.6450, 0.6500, 1.1787,
-        2.4714, 18.5888, 2.3251, 0.2936, 8.1446,
-        3.3083, 5.9628, 2.2146, 1.3907, 8.5690,
-        1.3547, 3.4091, 1.9081, 0.9058, 16.0329,
-        0.8258, 0.7821, 0.3851, 0.7120, 76.3240,
-        0.9066, 0.2845, 30.8101, 0.0360, 1.7237,
-        0.4430, 0.1258, 0.8839, 0.0057, 1.1211,
-        0.9639, 0.2536, 0.0210, 0.0127, 1.2210,
-        0.4708, 0.3484, 0.0292, 0.0118, 1.0188,
-        0.1258, 0.0470, 7.6614, 0.0052, 1.3215,
-        0.0384, 0.0011, 0.2110, 0.0916, 1.8059,
-        0.4378, 0.1318, 0.0001, 0.0026, 1.1890
-    ])
-
-    initial_pop_X[0, :] = best_solution
-
-    ref_points = np.array([[0.08, 0.08, 0.15]]) 
-
-    return RNSGA3(
-        ref_points=ref_points,
-        pop_per_ref_point=pop,
-        mu=0.05,
-        sampling=initial_pop_X,
-        n_offsprings=pop,
-        eliminate_duplicates=True
-    )
+    if args.scratch_min_free is not None:
+        set_key(".env", "SCRATCH_MIN_FREE_MB", str(args.scratch_min_free))
 
-    #return NSGA2(pop_size=pop, n_offsprings=pop, eliminate_duplicates=True, crossover= SBX(eta=15), mutation=PM(eta=5))
+def create_run_settings(args: Namespace, env_settings: Settings) -> dict:
+    project_directory = Path(args.project)
 
+    return {
+        "base_project_directory": project_directory,
+        "observed_data": project_directory / "observed.csv",
+        "shetran_path": env_settings.shetran_executable,
+        "preprocessor_path": env_settings.shetran_prepare_executable,
+        "checkpoint_path": project_directory / "checkpoint.pkl",
+        "debug": args.debug,
+        "config_path": project_directory / "config.json",
+        "log_path": project_directory / "log.csv",
+        "validation_path": project_directory / "validation.csv",
+        "comparison_path": project_directory / "validation_comparison.csv",
+        "scratch_directory": env_settings.scratch_directory,
+        "scratch_min_free_mb": env_settings.scratch_min_free_mb,
+    }
 
 def optimise(args: Namespace):
     env_settings = Settings()
@@ -84,28 +74,19 @@ def optimise(args: Namespace):
         "Executables not set! Please use shetran-optimise config to set them"
         return
 
-    debug_state = args.debug
-
-    project_directory = Path(args.project)
-
-    run_settings = {
-        "base_project_directory": project_directory,
-        "observed_data": project_directory / "observed.csv",
-        "shetran_path": env_settings.shetran_executable,
-        "preprocessor_path": env_settings.shetran_prepare_executable,
-        "checkpoint_path": project_directory / "checkpoint.pkl",
-        "debug": debug_state,
-        "config_path": project_directory / "config.json"
-    }
+    run_settings = create_run_settings(args, env_settings)
 
     config = load_shetran_params(run_settings["config_path"])
 
     run_settings["catchment_name"] = config["CatchmentDetails"]["CatchmentName"]
+    run_settings["retention"] = config.get("RetentionDetails", {})
+
+    algorithm_settings = get_algorithm_settings(config, args.algorithm)
 
     with Manager() as manager:
         shared_lock = manager.Lock()
 
-        n_threads = cpu_count()
+        n_threads = algorithm_settings["Workers"]
         pool = ThreadPool(n_threads)
         runner = StarmapParallelization(pool.starmap)
 
@@ -120,17 +101,23 @@ def optimise(args: Namespace):
                     algorithm = dill.load(file)
                 algorithm.problem.elementwise_runner = runner
                 algorithm.problem.lock = shared_lock
+                apply_resume_settings(algorithm, algorithm_settings)
             else:
                 print("Could not find checkpoint file! Starting fresh run.")
-                algorithm = setup_algorithm(args, n_threads, problem)
+                algorithm = setup_algorithm(algorithm_settings, problem)
         else:
             print("Starting fresh run.")
-            algorithm = setup_algorithm(args, n_threads, problem)
+            algorithm = setup_algorithm(algorithm_settings, problem)
+
+        print(
+            f"Using {type(algorithm).__name__} with population {algorithm.pop_size} "
+            f"and {algorithm.n_offsprings} offspring across {n_threads} workers."
+        )
 
         res = minimize(
             problem,
             algorithm,
-            termination=get_termination("n_gen", n_threads*8),
+            termination=setup_termination(algorithm_settings),
             verbose=True,
             callback=Checkpoint(run_settings["checkpoint_path"]),
             copy_algorithm=False,
@@ -139,4 +126,107 @@ def optimise(args: Namespace):
         pool.close()
 
         print("Optimisation Complete.")
-        print(f"Time taken: {res.exec_time} seconds")
\ No newline at end of file
+        print(f"Time taken: {res.exec_time} seconds")
+
+def get_validation_period(args: Namespace, config: dict) -> dict | None:
+    period = dict(config.get("ValidationDetails", {}))
+
+    if args.start or args.end:
+        period.pop("ScoreStart", None)
+        period.pop("ScoreEnd", None)
+
+    for field, value in (
+        ("SimulationStart", args.start),
+        ("SimulationEnd", args.end),
+        ("ScoreStart", args.score_start),
+        ("ScoreEnd", args.score_end),
+    ):
+        if value:
+            period[field] = value
+
+    if "SimulationStart" not in period or "SimulationEnd" not in period:
+        print("Validation period not set! Please add ValidationDetails to the project config")
+        return None
+
+    period.setdefault("ScoreStart", period["SimulationStart"])
+    period.setdefault("ScoreEnd", period["SimulationEnd"])
+
+    try:
+        dates = [date.fromisoformat(period[field]) for field in VALIDATION_PERIOD_FIELDS]
+    except ValueError as e:
+        print(f"Invalid validation date: {e}")
+        return None
+
+    simulation_start, simulation_end, score_start, score_end = dates
+
+    if not simulation_start <= score_start <= score_end <= simulation_end:
+        print(
+            f"Score period {period['ScoreStart']} to {period['ScoreEnd']} must lie within "
+            f"the simulation period {period['SimulationStart']} to {period['SimulationEnd']}!"
+        )
+        return None
+
+    return period
+
+def validate(args: Namespace):
+    env_settings = Settings()
+
+    if not os.path.exists(".env"):
+        create_settings()
+        print("Executables not set! Please use shetran-optimise config to set them")
+        return
+
+    if not env_settings.shetran_executable or not env_settings.shetran_prepare_executable:
+        print("Executables not set! Please use shetran-optimise config to set them")
+        return
+
+    run_settings = create_run_settings(args, env_settings)
+
+    config = load_shetran_params(run_settings["config_path"])
+
+    run_settings["catchment_name"] = config["CatchmentDetails"]["CatchmentName"]
+    run_settings["retention"] = config.get("RetentionDetails", {})
+
+    period = get_validation_period(args, config)
+    if period is None:
+        return
+
+    candidates = select_candidates(run_settings["log_path"], args.top)
+
+    with Manager() as manager:
+        shared_lock = manager.Lock()
+
+        validator = ShetranValidator(config, run_settings, shared_lock, period)
+
+        missing = [name for name in validator.param_names if name not in candidates.columns]
+        if missing:
+            print(
+                f"{run_settings['log_path']} is missing {len(missing)} parameters from the project config "
+                f"(e.g. {missing[0]}). Was the config changed since the optimisation run?"
+            )
+            return
+
+        completed = validator.completed_runs()
+        pending = [
+            row for _, row in candidates.iterrows() if row["Run_ID"] not in completed
+        ]
+
+        print(
+            f"Validating {len(pending)} of {len(candidates)} candidates "
+            f"({len(candidates) - len(pending)} already complete)."
+        )
+
+        n_threads = get_algorithm_settings(config)["Workers"]
+        pool = ThreadPool(n_threads)
+        pool.map(validator.replay, pending)
+        pool.close()
+
+    comparison = write_validation_comparison(
+        candidates,
+        run_settings["validation_path"],
+        run_settings["comparison_path"],
+        period,
+    )
+
+    print("Validation Complete.")
+    print(comparison.to_string(index=False))
@@ -1,5 +1,5 @@
 from argparse import ArgumentParser, Namespace
-from .cli import update_config, optimise
+from .cli import update_config, optimise, validate
 
 def main():
     print("Shetran-Optimiser v0.0.0")
@@ -23,6 +23,12 @@ def main():
     parser_config.add_argument(
         "--prepare-executable", type=str, help="Set path to Shetran-Prepare executable"
     )
+    parser_config.add_argument(
+        "--scratch-directory", type=str, help="Set directory for run files, e.g. /dev/shm"
+    )
+    parser_config.add_argument(
+        "--scratch-min-free", type=int, help="Set free space in MB to reserve per concurrent run on the scratch directory"
+    )
     parser_config.set_defaults(func=update_config)
 
     #Optimise args
@@ -36,10 +42,34 @@ def main():
         "--resume", "-r", action="store_true", help= "Resume algorithm run from a checkpoint pickle file"
     )
     parser_optimise.add_argument(
-        "--algorithm", "-a", type=str, help="Algorithm type to use"
+        "--algorithm", "-a", type=str, help="Algorithm type to use (RNSGA3, NSGA2, NSGA3), overriding the project config"
     )
     parser_optimise.set_defaults(func=optimise)
 
+    #Validate args
+    parser_validate = subparsers.add_parser(
+        "validate", help="Re-run optimised parameter sets over a validation period"
+    )
+    parser_validate.add_argument(
+        "project", type=str, help="Full path to the project directory"
+    )
+    parser_validate.add_argument(
+        "--top", "-n", type=int, help="Number of best parameter sets to validate, instead of the Pareto front"
+    )
+    parser_validate.add_argument(
+        "--start", type=str, help="Validation simulation start date (YYYY-MM-DD)"
+    )
+    parser_validate.add_argument(
+        "--end", type=str, help="Validation simulation end date (YYYY-MM-DD)"
+    )
+    parser_validate.add_argument(
+        "--score-start", type=str, help="Validation score start date (YYYY-MM-DD), defaults to the simulation start"
+    )
+    parser_validate.add_argument(
+        "--score-end", type=str, help="Validation score end date (YYYY-MM-DD), defaults to the simulation end"
+    )
+    parser_validate.set_defaults(func=validate)
+
     args = parser.parse_args()
 
     if hasattr(args, "func"):
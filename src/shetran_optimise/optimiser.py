@@ -14,10 +14,69 @@ from pymoo.core.callback import Callback
 
 from .shetran_interaction import *
 from .results_analysis import *
+from .run_storage import get_run_directory, retain_run_outputs
 
 
-class ShetranProblem(ElementwiseProblem):
-    def __init__(self, config: dict, run_settings: dict, lock, **kwargs):
+def get_params_to_optimise(config: dict, master_dict: dict) -> list:
+    """
+    Flatten a configuration of parameters and their bounds into a list of parameters to optimise.
+
+    :param config: Configuration dictionary loaded from the project config json.
+    :type config: dict
+    :param master_dict: Dictionary of parameters read from the master XML file.
+    :type master_dict: dict
+    """
+    params_to_optimise = []
+
+    for section, s_list in config.items():
+        if section not in master_dict:
+            continue
+
+        for row in s_list:
+            for param, bounds in row["Parameters"].items():
+                p = {}
+                descriptor_item = list(row["Descriptors"].items())[0]
+                p["name"] = f"{descriptor_item[0]}{descriptor_item[1]}{param}"
+                p["param_name"] = param
+                p["bounds"] = bounds
+                p["Section"] = section
+                p["Descriptors"] = row["Descriptors"]
+                params_to_optimise.append(p)
+
+    return params_to_optimise
+
+
+def apply_parameters(master_dict: dict, params_to_optimise: list, x) -> dict:
+    """
+    Create a copy of the master parameters with a set of optimised values applied.
+
+    :param master_dict: Dictionary of parameters read from the master XML file.
+    :type master_dict: dict
+    :param params_to_optimise: List of parameters to optimise.
+    :type params_to_optimise: list
+    :param x: Values of each parameter to optimise, in the same order.
+    """
+    update_dict = copy.deepcopy(master_dict)
+
+    for i, prop in enumerate(params_to_optimise):
+        section = prop["Section"]
+        descriptors = prop["Descriptors"]
+        param_key = prop["param_name"]
+
+        for row in update_dict[section]:
+            if row["Descriptors"] == descriptors:
+                row["Parameters"][param_key] = x[i]
+                break
+
+    return update_dict
+
+
+class ShetranRunner:
+    """
+    Shared setup and execution of single SHETRAN runs for a project.
+    """
+
+    def setup_runner(self, config: dict, run_settings: dict, lock):
         self.run_settings = run_settings
 
         self.base_dir = Path(f"{self.run_settings['base_project_directory']}")
@@ -27,49 +86,50 @@ class ShetranProblem(ElementwiseProblem):
         self.preprocessor = Path(self.run_settings["preprocessor_path"])
         self.shetran = Path(self.run_settings["shetran_path"])
         self.observed = self.base_dir / f"{self.run_settings['observed_data']}"
-        self.log = self.base_dir / "log.csv"
         self.lock = lock
         self.master_dict = read_xml_file(self.master_xml)
         self.tocopy = self.base_dir / "tocopy"
 
-        params_to_optimise = []
-
-        for section, s_list in config.items():
-            if section == "CatchmentDetails":
-                pass
-            else:
-                for row in s_list:
-                    for param, bounds in row["Parameters"].items():
-                        p = {}
-                        descriptor_item = list(row["Descriptors"].items())[0]
-                        p["name"] = f"{descriptor_item[0]}{descriptor_item[1]}{param}"
-                        p["param_name"] = param
-                        p["bounds"] = bounds
-                        p["Section"] = section
-                        p["Descriptors"] = row["Descriptors"]
-                        params_to_optimise.append(p)
-
-        self.pto = params_to_optimise
-
-        param_names = [p["name"] for p in self.pto]
-        objective_fn_names = ["1-KGE", "1-LogKGE", "RMSE"]
-        header = ["Timestamp", "Run_ID"] + param_names + objective_fn_names
+        self.pto = get_params_to_optimise(config, self.master_dict)
+        self.param_names = [p["name"] for p in self.pto]
+        self.active_scratch_runs = 0
 
-        with open(self.log, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-
-        xl = np.array([p["bounds"][0] for p in self.pto])
-        xu = np.array([p["bounds"][1] for p in self.pto])
+    def run_parameter_set(
+        self,
+        x,
+        run_id: str,
+        run_name: str,
+        results_path: Path,
+        log_values: list,
+        period: dict | None = None,
+    ) -> tuple:
+        """
+        Prepare, run and score a single parameter set, then clean up its run directory.
 
-        super().__init__(
-            n_var=len(self.pto), n_obj=3, n_constr=1, xl=xl, xu=xu, **kwargs
-        )
-
-    def _evaluate(self, x, out, *args, **kwargs):
-        run_id = uuid.uuid4().hex[:8]
-
-        run_dir = self.base_dir / "runs" / f"run_{run_id}"
+        :param x: Values of each parameter to optimise.
+        :param run_id: Identifier of the run written to the results file.
+        :type run_id: str
+        :param run_name: Name of the run directory.
+        :type run_name: str
+        :param results_path: Full path to the csv file the result row is appended to.
+        :type results_path: Path
+        :param log_values: Values written to the result row between the run id and the objectives.
+        :type log_values: list
+        :param period: Simulation and score period to run over, or None to use the calibration setup.
+        :type period: dict | None
+        :return: Objective function values and whether the run failed.
+        :rtype: tuple
+        """
+        with self.lock:
+            run_dir, on_scratch = get_run_directory(
+                self.base_dir,
+                run_name,
+                self.run_settings.get("scratch_directory"),
+                self.run_settings.get("scratch_min_free_mb", 1024),
+                self.active_scratch_runs,
+            )
+            if on_scratch:
+                self.active_scratch_runs += 1
 
         run_xml = run_dir / f"{self.run_settings['catchment_name']}_Library_File.xml"
         rundata = run_dir / f"rundata_{self.run_settings['catchment_name']}.txt"
@@ -79,7 +139,15 @@ class ShetranProblem(ElementwiseProblem):
         )
         run_help = run_dir / "helpmessages"
 
-        objectives = [1e10, 1e10, 1e10]
+        objectives = [FAILED_RUN_OBJECTIVE] * len(OBJECTIVE_FUNCTION_NAMES)
+        failed = True
+
+        score_kwargs = {}
+        if period is not None:
+            score_kwargs = {
+                "score_period": (period["ScoreStart"], period["ScoreEnd"]),
+                "simulation_start": period["SimulationStart"],
+            }
 
         try:
             os.makedirs(run_dir, exist_ok=True)
@@ -87,49 +155,88 @@ class ShetranProblem(ElementwiseProblem):
 
             shutil.copytree(self.tocopy, run_dir, dirs_exist_ok=True)
 
-            update_dict = copy.deepcopy(self.master_dict)
-
-            for i, prop in enumerate(self.pto):
-                section = prop["Section"]
-                descriptors = prop["Descriptors"]
-                param_key = prop["param_name"]
-
-                for row in update_dict[section]:
-                    if row["Descriptors"] == descriptors:
-                        row["Parameters"][param_key] = x[i]
-                        break
+            update_dict = apply_parameters(self.master_dict, self.pto, x)
 
             modify_xml_file(run_xml, update_dict)
 
+            if period is not None:
+                set_simulation_period(
+                    run_xml, period["SimulationStart"], period["SimulationEnd"]
+                )
+
             run_preprocessor(self.preprocessor, run_xml)
 
             run_shetran(self.shetran, rundata)
             with self.lock:
                 objectives = calculate_objective_function_metrics(
-                    self.observed, run_output
+                    self.observed, run_output, **score_kwargs
                 )
-            out["F"] = list(objectives)
-            out["G"] = [0]
-        except:
-            out["F"] = objectives
-            out["G"] = [1]
+            failed = False
+        except Exception as e:
+            print(f"Run {run_name} failed: {e}")
         finally:
             try:
                 timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                log_row = [timestamp, run_id] + list(x) + list(objectives)
+                result_row = [timestamp, run_id] + list(log_values) + list(objectives)
                 with self.lock:
-                    with open(self.log, "a", newline="") as f:
+                    with open(results_path, "a", newline="") as f:
                         writer = csv.writer(f)
-                        writer.writerow(log_row)
+                        writer.writerow(result_row)
 
-                print(f"Logging successful for {run_id}!")
+                print(f"Logging successful for {run_name}!")
 
             except Exception as log_err:
-                print(f"Logging failed for {run_id}: {log_err}")
+                print(f"Logging failed for {run_name}: {log_err}")
+
+            try:
+                retain_run_outputs(
+                    run_dir,
+                    self.base_dir / "outputs",
+                    self.run_settings["catchment_name"],
+                    failed,
+                    self.run_settings.get("retention", {}),
+                )
+            except Exception as retain_err:
+                print(f"Retaining outputs failed for {run_name}: {retain_err}")
 
             if os.path.exists(run_dir):
                 shutil.rmtree(run_dir, ignore_errors=True)
 
+            if on_scratch:
+                with self.lock:
+                    self.active_scratch_runs -= 1
+
+        return list(objectives), failed
+
+
+class ShetranProblem(ShetranRunner, ElementwiseProblem):
+    def __init__(self, config: dict, run_settings: dict, lock, **kwargs):
+        self.setup_runner(config, run_settings, lock)
+        self.log = self.base_dir / "log.csv"
+
+        header = ["Timestamp", "Run_ID"] + self.param_names + OBJECTIVE_FUNCTION_NAMES
+
+        with open(self.log, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+
+        xl = np.array([p["bounds"][0] for p in self.pto])
+        xu = np.array([p["bounds"][1] for p in self.pto])
+
+        super().__init__(
+            n_var=len(self.pto), n_obj=3, n_constr=1, xl=xl, xu=xu, **kwargs
+        )
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        run_id = uuid.uuid4().hex[:8]
+
+        objectives, failed = self.run_parameter_set(
+            x, run_id, f"run_{run_id}", self.log, list(x)
+        )
+
+        out["F"] = objectives
+        out["G"] = [1 if failed else 0]
+
     def __getstate__(self):
         state = self.__dict__.copy()
         if "lock" in state:
@@ -139,6 +246,7 @@ class ShetranProblem(ElementwiseProblem):
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.lock = None
+        self.active_scratch_runs = 0
 
 class Checkpoint(Callback):
     def __init__(self, filename="checkpoint.pkl"):
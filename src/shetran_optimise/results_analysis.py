@@ -4,7 +4,12 @@ import pandas as pd
 import numpy as np
 
 from pathlib import Path
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
 
+OBJECTIVE_FUNCTION_NAMES = ["1-KGE", "1-LogKGE", "RMSE"]
+CALIBRATION_PERIOD = ("1992-01-01", "2001-12-31")
+FAILED_RUN_OBJECTIVE = 1e10
+VALIDATION_PERIOD_FIELDS = ["SimulationStart", "SimulationEnd", "ScoreStart", "ScoreEnd"]
 
 def calculate_KGE(observed_values: pd.Series, simulated_values: pd.Series) -> float:
     """
@@ -49,7 +54,10 @@ def calculate_RMSE(observed_values, simulated_values) -> float:
 
 
 def calculate_objective_function_metrics(
-    observed_values: Path, simulated_values: Path
+    observed_values: Path,
+    simulated_values: Path,
+    score_period: tuple = CALIBRATION_PERIOD,
+    simulation_start: str | None = None,
 ) -> tuple:
     """
     Caculates 3 objective function metrics of a Shetran run.
@@ -58,6 +66,10 @@ def calculate_objective_function_metrics(
     :type observed_values: Path
     :param simulated_values: Full path to simulated flow values csv file location.
     :type simulated_values: Path
+    :param score_period: Start and end dates of the period to score over.
+    :type score_period: tuple
+    :param simulation_start: Start date of the simulation, if it does not start with the observed record.
+    :type simulation_start: str | None
     """
     obs_df = pd.read_csv(
         observed_values,
@@ -72,13 +84,16 @@ def calculate_objective_function_metrics(
         simulated_values, header=None, skiprows=1, names=["SimulatedFlow"]
     )
 
+    if simulation_start is not None:
+        obs_df = obs_df[simulation_start:].iloc[: len(sim_df)]
+
     sim_df.index = obs_df.index
 
     obs_df = obs_df.interpolate()
 
     model_df = pd.concat([obs_df, sim_df], axis=1)
 
-    model_df = model_df["1992-01-01":"2001-12-31"]
+    model_df = model_df[score_period[0] : score_period[1]]
 
     kge = calculate_KGE(model_df["ObservedFlow"], model_df["SimulatedFlow"])
 
@@ -93,3 +108,102 @@ def calculate_objective_function_metrics(
     )
 
     return (1 - kge, 1 - log_kge, fdc_rmse)
+
+
+def select_candidates(log_path: Path, top_n: int | None = None) -> pd.DataFrame:
+    """
+    Select parameter sets from an optimisation log for validation.
+
+    Failed runs are discarded and the remainder ranked by non-dominated front,
+    then by 1-KGE within each front.
+
+    :param log_path: Full path to the optimisation log csv file location.
+    :type log_path: Path
+    :param top_n: Number of parameter sets to select. Only the Pareto front is selected if None.
+    :type top_n: int | None
+    :return: Selected rows of the optimisation log.
+    :rtype: pd.DataFrame
+    """
+    log_df = pd.read_csv(log_path, dtype={"Run_ID": str})
+    log_df = log_df[
+        (log_df[OBJECTIVE_FUNCTION_NAMES] < FAILED_RUN_OBJECTIVE).all(axis=1)
+    ]
+
+    if log_df.empty:
+        raise Exception(f"No successful runs found in {log_path}!")
+
+    log_df = log_df.drop_duplicates(subset="Run_ID").reset_index(drop=True)
+
+    fronts = NonDominatedSorting().do(log_df[OBJECTIVE_FUNCTION_NAMES].to_numpy())
+
+    log_df["Front"] = 0
+    for rank, front in enumerate(fronts):
+        log_df.loc[front, "Front"] = rank
+
+    log_df = log_df.sort_values(["Front", OBJECTIVE_FUNCTION_NAMES[0]])
+
+    if top_n is None:
+        return log_df[log_df["Front"] == 0]
+
+    return log_df.head(top_n)
+
+
+def read_validation_results(validation_path: Path, period: dict) -> pd.DataFrame:
+    """
+    Read the validation results that were run over a given simulation and score period.
+
+    :param validation_path: Full path to the validation results csv file location.
+    :type validation_path: Path
+    :param period: Simulation and score period the results must match.
+    :type period: dict
+    :return: Validation results for the period.
+    :rtype: pd.DataFrame
+    """
+    validation_df = pd.read_csv(
+        validation_path,
+        dtype={field: str for field in ["Run_ID"] + VALIDATION_PERIOD_FIELDS},
+    )
+
+    for field in VALIDATION_PERIOD_FIELDS:
+        validation_df = validation_df[validation_df[field] == str(period[field])]
+
+    return validation_df
+
+
+def write_validation_comparison(
+    candidates: pd.DataFrame, validation_path: Path, comparison_path: Path, period: dict
+) -> pd.DataFrame:
+    """
+    Write a comparison of calibration and validation performance for a set of parameter sets.
+
+    :param candidates: Selected rows of the optimisation log.
+    :type candidates: pd.DataFrame
+    :param validation_path: Full path to the validation results csv file location.
+    :type validation_path: Path
+    :param comparison_path: Full path to write the comparison csv file to.
+    :type comparison_path: Path
+    :param period: Simulation and score period to compare against.
+    :type period: dict
+    :return: Comparison of calibration and validation objective function metrics.
+    :rtype: pd.DataFrame
+    """
+    validation_df = read_validation_results(validation_path, period)
+    validation_df = validation_df.drop_duplicates(subset="Run_ID", keep="last")
+
+    calibration_df = candidates[["Run_ID", "Front"] + OBJECTIVE_FUNCTION_NAMES]
+
+    comparison_df = calibration_df.merge(
+        validation_df[["Run_ID"] + OBJECTIVE_FUNCTION_NAMES],
+        on="Run_ID",
+        how="left",
+        suffixes=(" Calibration", " Validation"),
+    )
+
+    for name in OBJECTIVE_FUNCTION_NAMES:
+        comparison_df[f"{name} Change"] = (
+            comparison_df[f"{name} Validation"] - comparison_df[f"{name} Calibration"]
+        )
+
+    comparison_df.to_csv(comparison_path, index=False)
+
+    return comparison_df
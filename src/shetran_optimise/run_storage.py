@@ -0,0 +1,115 @@
+import os
+import shutil
+
+from pathlib import Path
+
+
+def get_directory_size_mb(directory: Path) -> float:
+    """
+    Calculate the total size of the files in a directory, ignoring files removed while it is walked.
+
+    :param directory: Full path to the directory.
+    :type directory: Path
+    :return: Total size in MB.
+    :rtype: float
+    """
+    total = 0
+
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+
+    return total / 1024**2
+
+
+def get_run_directory(
+    base_dir: Path,
+    run_name: str,
+    scratch_directory: str | None = None,
+    min_free_mb: int = 1024,
+    active_runs: int = 0,
+) -> tuple:
+    """
+    Choose where a run directory is created, preferring the scratch directory when it has space.
+
+    Each run on the scratch directory reserves min_free_mb. A new run is only
+    placed there if the free space, plus the space already written by the
+    active runs, covers the reservations of the active runs and the new one.
+
+    :param base_dir: Full path to the project directory.
+    :type base_dir: Path
+    :param run_name: Name of the run directory.
+    :type run_name: str
+    :param scratch_directory: Full path to a scratch directory such as /dev/shm, or None to use the project disk.
+    :type scratch_directory: str | None
+    :param min_free_mb: Free space in MB to reserve for each run on the scratch directory.
+    :type min_free_mb: int
+    :param active_runs: Number of runs of this project currently using the scratch directory.
+    :type active_runs: int
+    :return: Full path to the run directory and whether it is on the scratch directory.
+    :rtype: tuple
+    """
+    if scratch_directory:
+        scratch_root = Path(scratch_directory)
+        scratch_runs = scratch_root / f"{base_dir.name}_runs"
+        required_mb = min_free_mb * (active_runs + 1)
+        try:
+            os.makedirs(scratch_runs, exist_ok=True)
+            if not os.access(scratch_runs, os.W_OK):
+                raise PermissionError(f"{scratch_runs} is not writable")
+
+            free_mb = shutil.disk_usage(scratch_runs).free / 1024**2
+            available_mb = free_mb + get_directory_size_mb(scratch_runs)
+            if available_mb >= required_mb:
+                return scratch_runs / run_name, True
+            print(
+                f"Scratch directory {scratch_root} has {available_mb:.0f} MB available of "
+                f"{required_mb} MB reserved for {active_runs + 1} runs, using project disk for {run_name}."
+            )
+        except OSError as e:
+            print(f"Scratch directory {scratch_root} not available ({e}), using project disk for {run_name}.")
+
+    return base_dir / "runs" / run_name, False
+
+
+def retain_run_outputs(
+    run_dir: Path, store_dir: Path, catchment_name: str, failed: bool, retention: dict
+):
+    """
+    Copy the run outputs named in a retention policy to the results store.
+
+    :param run_dir: Full path to the run directory.
+    :type run_dir: Path
+    :param store_dir: Full path to the results store directory.
+    :type store_dir: Path
+    :param catchment_name: Name of the catchment being modelled.
+    :type catchment_name: str
+    :param failed: Whether the run failed to produce a score.
+    :type failed: bool
+    :param retention: Retention policy with "Discharge" and "FailedLogs" flags.
+    :type retention: dict
+    """
+    to_keep = []
+
+    if retention.get("Discharge", False):
+        to_keep.append(
+            run_dir / f"output_{catchment_name}_discharge_sim_regulartimestep.txt"
+        )
+
+    if failed and retention.get("FailedLogs", False):
+        to_keep.append(run_dir / f"output_{catchment_name}_pri.txt")
+        to_keep.append(run_dir / "terminal.txt")
+
+    to_keep = [path for path in to_keep if path.exists()]
+
+    if not to_keep:
+        return
+
+    run_store = store_dir / run_dir.name
+    os.makedirs(run_store, exist_ok=True)
+
+    for path in to_keep:
+        shutil.copy2(path, run_store / path.name)
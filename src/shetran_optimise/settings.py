@@ -6,6 +6,8 @@ class Settings(BaseSettings):
     shetran_executable: Optional[str] = None
     shetran_prepare_executable: Optional[str] = None
     calibrated_timeout: Optional[int] = -1
+    scratch_directory: Optional[str] = None
+    scratch_min_free_mb: Optional[int] = 1024
 
     class Config:
         env_file = ".env"
@@ -2,6 +2,8 @@ import subprocess
 import csv
 import json
 import time
+import re
+import datetime
 
 import xml.etree.ElementTree as ET
 
@@ -254,3 +256,35 @@ def modify_xml_file(xml_file_path: Path, parameters: dict):
 
     with open(xml_file_path, "w", encoding="utf-8") as file:
         file.write("\n".join(xml_list))
+
+
+def set_simulation_period(xml_file_path: Path, start: str, end: str):
+    """
+    Modify the simulation start and end dates of an XML file that is an input to the Shetran pre-processor.
+
+    :param xml_file_path: Full path to XML file location.
+    :type xml_file_path: Path
+    :param start: Simulation start date in ISO format.
+    :type start: str
+    :param end: Simulation end date in ISO format.
+    :type end: str
+    """
+    dates = {
+        "Start": datetime.date.fromisoformat(start),
+        "End": datetime.date.fromisoformat(end),
+    }
+
+    with open(xml_file_path, "r", encoding="utf-8") as file:
+        xml_text = file.read()
+
+    for prefix, date in dates.items():
+        for field, value in (("Day", date.day), ("Month", date.month), ("Year", date.year)):
+            tag = f"{prefix}{field}"
+            xml_text, count = re.subn(
+                rf"<{tag}>.*?</{tag}>", f"<{tag}>{value}</{tag}>", xml_text
+            )
+            if count == 0:
+                raise Exception(f"Could not find {tag} in {xml_file_path.name}!")
+
+    with open(xml_file_path, "w", encoding="utf-8") as file:
+        file.write(xml_text)
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+from .shetran_interaction import *
+from .results_analysis import *
+from .optimiser import ShetranRunner
+
+
+class ShetranValidator(ShetranRunner):
+    def __init__(self, config: dict, run_settings: dict, lock, period: dict):
+        self.setup_runner(config, run_settings, lock)
+        self.results = Path(self.run_settings["validation_path"])
+        self.period = period
+
+        if not os.path.exists(self.results):
+            header = ["Timestamp", "Run_ID"] + VALIDATION_PERIOD_FIELDS + OBJECTIVE_FUNCTION_NAMES
+            with open(self.results, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+
+    def completed_runs(self) -> set:
+        """
+        Find the calibration runs that already have a successful validation replay over this period.
+        """
+        results_df = read_validation_results(self.results, self.period)
+        results_df = results_df[
+            (results_df[OBJECTIVE_FUNCTION_NAMES] < FAILED_RUN_OBJECTIVE).all(axis=1)
+        ]
+        return set(results_df["Run_ID"])
+
+    def replay(self, candidate: pd.Series) -> list:
+        """
+        Re-run a calibrated parameter set over the validation period and score it.
+
+        :param candidate: Row of the optimisation log containing the run id and parameter values.
+        :type candidate: pd.Series
+        """
+        run_id = candidate["Run_ID"]
+        x = candidate[self.param_names].to_numpy(dtype=float)
+        period_name = "_".join(
+            self.period[field].replace("-", "") for field in VALIDATION_PERIOD_FIELDS
+        )
+
+        objectives, _ = self.run_parameter_set(
+            x,
+            run_id,
+            f"validation_{run_id}_{period_name}",
+            self.results,
+            [self.period[field] for field in VALIDATION_PERIOD_FIELDS],
+            period=self.period,
+        )
+
+        return objectives